@@ -0,0 +1,15 @@
+# cython: boundscheck=False, wraparound=False
+# Native gather kernel for the cube's hot path: state[j] = state[perm[j]].
+# Build in place with:  python setup.py build_ext --inplace
+# main.py falls back to numpy fancy indexing when the extension is absent.
+
+ctypedef fused index_t:
+    unsigned char
+    int
+
+
+cpdef apply_perm(signed char[::1] state, index_t[::1] perm):
+    cdef Py_ssize_t j, n = state.shape[0]
+    cdef signed char[::1] tmp = state.copy()
+    for j in range(n):
+        state[j] = tmp[perm[j]]
@@ -1,6 +1,16 @@
 
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import _cube_kernel  # built from _cube_kernel.pyx, see setup.py
+except ImportError:
+    _cube_kernel = None
+
 # Rubik's Cube
 #   ____                  +---+
 # |\  A  \                | A |
@@ -44,148 +54,436 @@ import numpy as np
 #    \ |            |                 \ |            |
 #     \|____________|                  \|____________|
 
+# Flat gather indices equivalent to np.rot90 on a (size, size) face:
+# face.ravel()[perm] is the face rotated by 90*k degrees.  Cached per
+# (size, k) so each table build computes them at most once.
+_ROT90_PERMS = {}
+
+def _rot90_perm(size, k):
+    try:
+        return _ROT90_PERMS[size, k % 4]
+    except KeyError:
+        idx = np.rot90(np.arange(size * size).reshape(size, size), k % 4)
+        perm = _ROT90_PERMS[size, k % 4] = idx.ravel().copy()
+        return perm
+
+# Above this size a face no longer sits in L1 and a quarter-turn starts
+# to behave like an unblocked transpose (stride-size stores); rotate it
+# in 16x16 tiles instead so each tile stays cache-resident.
+_ROT90_TILE_THRESHOLD = 64
+_ROT90_BLOCK = 16
+
+def _tiled_rot90(face, k):
+    k %= 4
+    if k == 0:
+        return face.copy()
+    size = face.shape[0]
+    out = np.empty_like(face)
+    b = _ROT90_BLOCK
+    for y0 in range(0, size, b):
+        y1 = min(y0 + b, size)
+        for x0 in range(0, size, b):
+            x1 = min(x0 + b, size)
+            block = np.rot90(face[y0:y1, x0:x1], k)
+            if k == 1:
+                out[size - x1:size - x0, y0:y1] = block
+            elif k == 2:
+                out[size - y1:size - y0, size - x1:size - x0] = block
+            else:
+                out[x0:x1, size - y1:size - y0] = block
+    return out
+
+def _rot90_inplace(face, k):
+    # Rotate a square face in place, unlike np.rot90 whose strided view
+    # (once assigned back) would leave the face non-contiguous.
+    size = face.shape[0]
+    if size > _ROT90_TILE_THRESHOLD:
+        face[:] = _tiled_rot90(face, k)
+    else:
+        flat = face.ravel()
+        flat[:] = flat[_rot90_perm(size, k)]
+
+
+# Reference move implementations, only used to build the permutation
+# tables at __init__ time.  `faces` is a list of six (size,size) arrays
+# in slot order A..F.  The hot path never runs this code: each move is
+# applied as a single precomputed gather over the flat state buffer.
+
+# ex) R1
+#          *  *  *                                 *  *  *
+#          *  *  *                                 *  *  *
+#          *  *  *                                 *  *  *
+# *  *  *  *  *  *  *  *  *  *  *  *      *  *  *  *  *  *  *  *  *  *  *  *
+# *  *  *  *  *  *  *  *  *  *  *  * ==>  *  *  *  *  *  *  *  *  *  *  *  *
+# 1  2  3  4  5  6  7  8  9 10 11 12     10 11 12  1  2  3  4  5  6  7  8  9
+#         13 14 15                                19 16 13
+#         16 17 18                                20 17 14
+#         19 20 21                                21 18 15
+#
+def _reference_rotate_row(faces, n):
+    A, B, C, D, E, F = faces
+    # B -> C -> D -> E -> B
+    # The 4-cycle applied k times is a single shift by k through a
+    # scratch stack of the cycle's slices — one allocation, no
+    # per-iteration temporary.
+    if n in (1, 2, 3):
+        rows = np.stack((B[-1], C[-1], D[-1], E[-1]))
+        np.copyto(B[-1], rows[(0 - n) % 4], casting='no')
+        np.copyto(C[-1], rows[(1 - n) % 4], casting='no')
+        np.copyto(D[-1], rows[(2 - n) % 4], casting='no')
+        np.copyto(E[-1], rows[(3 - n) % 4], casting='no')
+        # rotate F by -90*n
+        _rot90_inplace(F, 4 - n)
+    elif n in (4, 5, 6):
+        k = n - 3
+        blocks = np.stack((B[:-1], C[:-1], D[:-1], E[:-1]))
+        np.copyto(B[:-1], blocks[(0 - k) % 4], casting='no')
+        np.copyto(C[:-1], blocks[(1 - k) % 4], casting='no')
+        np.copyto(D[:-1], blocks[(2 - k) % 4], casting='no')
+        np.copyto(E[:-1], blocks[(3 - k) % 4], casting='no')
+        # rotate A by 90*n
+        _rot90_inplace(A, k)
+
+# ex) C1
+#          *  *  1                                 *  *  4
+#          *  *  2                                 *  *  5
+#          *  *  3                                 *  *  6
+# *  *  *  *  *  4 13 14 15 12  *  *      *  *  *  *  *  7 19 16 13  3  *  *
+# *  *  *  *  *  5 16 17 18 11  *  * ==>  *  *  *  *  *  8 20 17 14  2  *  *
+# *  *  *  *  *  6 19 20 21 10  *  *      *  *  *  *  *  9 21 18 15  1  *  *
+#          *  *  7                                 *  * 10
+#          *  *  8                                 *  * 11
+#          *  *  9                                 *  * 12
+#
+def _reference_rotate_column(faces, n):
+    A, B, C, D, E, F = faces
+    # A -> E -> F -> C -> A
+    # E is loaded flipped so the cycle becomes a pure shift; the flip is
+    # undone when storing back to E.
+    if n in (1, 2, 3):
+        cols = np.stack((A[:, -1], C[:, -1], F[:, -1], E[::-1, 0]))
+        np.copyto(A[:, -1], cols[(0 + n) % 4], casting='no')
+        np.copyto(C[:, -1], cols[(1 + n) % 4], casting='no')
+        np.copyto(F[:, -1], cols[(2 + n) % 4], casting='no')
+        np.copyto(E[:,  0], cols[(3 + n) % 4][::-1], casting='no')
+        # rotate D by -90*n
+        _rot90_inplace(D, 4 - n)
+    elif n in (4, 5, 6):
+        k = n - 3
+        blocks = np.stack((A[:, :-1], C[:, :-1], F[:, :-1], E[::-1, :0:-1]))
+        np.copyto(A[:, :-1], blocks[(0 + k) % 4], casting='no')
+        np.copyto(C[:, :-1], blocks[(1 + k) % 4], casting='no')
+        np.copyto(F[:, :-1], blocks[(2 + k) % 4], casting='no')
+        np.copyto(E[:,  1:], blocks[(3 + k) % 4][::-1, ::-1], casting='no')
+        # rotate B by 90*n
+        _rot90_inplace(B, k)
+
+# ex) L1
+#           1  2  3                                4  5  6
+#           *  *  *                                *  *  *
+#           *  *  *                                *  *  *
+# 12  *  *  *  *  *  *  *  4 13 14 15     3  *  *  *  *  *  *  *  7 19 16 13
+# 11  *  *  *  *  *  *  *  5 16 17 18 ==> 2  *  *  *  *  *  *  *  8 20 17 14
+# 10  *  *  *  *  *  *  *  6 19 20 21     1  *  *  *  *  *  *  *  9 21 18 15
+#           *  *  *                                *  *  *
+#           *  *  *                                *  *  *
+#           9  8  7                               12 11 10
+#
+def _reference_rotate_level(faces, n):
+    A, B, C, D, E, F = faces
+    # A -> B -> F -> D -> A
+    # F and B are loaded flipped (resp. pre-rotated in the n >= 4
+    # branch) so the cycle becomes a pure shift; the orientation is
+    # restored when storing back.
+    if n in (1, 2, 3):
+        rows = np.stack((A[0], D[:, -1], F[-1, ::-1], B[::-1, 0]))
+        np.copyto(A[0],     rows[(0 + n) % 4], casting='no')
+        np.copyto(D[:, -1], rows[(1 + n) % 4], casting='no')
+        np.copyto(F[-1],    rows[(2 + n) % 4][::-1], casting='no')
+        np.copyto(B[:,  0], rows[(3 + n) % 4][::-1], casting='no')
+        # rotate E by -90*n
+        _rot90_inplace(E, 4 - n)
+    elif n in (4, 5, 6):
+        k = n - 3
+        blocks = np.stack((A[1:], np.rot90(D[:, :-1]),
+                           np.rot90(F[:-1], 2), np.rot90(B[:, 1:], 3)))
+        np.copyto(A[1:],     blocks[(0 + k) % 4], casting='no')
+        np.copyto(D[:, :-1], np.rot90(blocks[(1 + k) % 4], 3), casting='no')
+        np.copyto(F[:-1],    np.rot90(blocks[(2 + k) % 4], 2), casting='no')
+        np.copyto(B[:,  1:], np.rot90(blocks[(3 + k) % 4], 1), casting='no')
+        # rotate C by 90*n
+        _rot90_inplace(C, k)
+
+
+_REFERENCE_ROTATES = {
+    'R': _reference_rotate_row,
+    'C': _reference_rotate_column,
+    'L': _reference_rotate_level,
+}
+
+def _compute_move_perms(size):
+    # For each of the 18 moves, apply the reference rotation to a cube
+    # whose cells hold their own flat index; the flattened result is the
+    # gather permutation for that move (new_state = state[perm]).
+    perms = {}
+    for prefix, rotate in _REFERENCE_ROTATES.items():
+        # Only the two single-turn moves (n=1 and n=4) run the reference
+        # rotation; repeating a move is the same as composing its
+        # permutation with itself, so n=2,3 (and 5,6) are derived.
+        for base_n in (1, 4):
+            sentinel = np.arange(6 * size * size, dtype=np.int32)
+            faces = [face.copy() for face in sentinel.reshape(6, size, size)]
+            rotate(faces, base_n)
+            perm = np.stack(faces).ravel()
+            perms['%s%d' % (prefix, base_n)] = perm
+            perms['%s%d' % (prefix, base_n + 1)] = perm[perm]
+            perms['%s%d' % (prefix, base_n + 2)] = perm[perm][perm]
+    return perms
+
+
+# Fold a sequence of moves (given as row indices into the stacked
+# permutation table) into one permutation: applying p then q is the same
+# as applying p[q] once, since (s[p])[q] == s[p[q]].  Compiled with
+# numba when available; the numpy fallback is identical in behavior.
+if njit is not None:
+    @njit(cache=True)
+    def _fold_moves(moves, perm_table):
+        perm = np.arange(perm_table.shape[1], dtype=np.int32)
+        for i in range(moves.shape[0]):
+            p = perm_table[moves[i]]
+            tmp = perm.copy()
+            for j in range(perm.shape[0]):
+                perm[j] = tmp[p[j]]
+        return perm
+else:
+    def _fold_moves(moves, perm_table):
+        perm = np.arange(perm_table.shape[1], dtype=np.int32)
+        for i in range(moves.shape[0]):
+            perm = perm[perm_table[moves[i]]]
+        return perm
+
+
+def _specialize_apply(flat, perm, scratch):
+    # Partially evaluate the hot path for one (state, folded key) pair:
+    # the state view, permutation and kernel are all bound into a
+    # zero-argument closure, so a repeat encryption is one call with no
+    # attribute or dict lookups.  (A closure gives the same
+    # specialization as exec-generated source, minus the runtime
+    # compile.)
+    if _cube_kernel is not None:
+        kernel = _cube_kernel.apply_perm
+        def apply_key():
+            kernel(flat, perm)
+    else:
+        def apply_key():
+            # mode='clip' skips the bounds-checking (and buffering) path;
+            # perm indices are in range by construction.
+            np.take(flat, perm, out=scratch, mode='clip')
+            flat[:] = scratch
+    return apply_key
+
+
 class RubikCube:
 
     def __init__(self, size):
         self.size = size
-        self.A = np.zeros((size,size), dtype=np.int8)
-        self.B = np.zeros((size,size), dtype=np.int8)
-        self.C = np.zeros((size,size), dtype=np.int8)
-        self.D = np.zeros((size,size), dtype=np.int8)
-        self.E = np.zeros((size,size), dtype=np.int8)
-        self.F = np.zeros((size,size), dtype=np.int8)
-        self.faces = [self.A, self.B, self.C, self.D, self.E, self.F]
+        # All six faces live in one contiguous buffer (slot order A..F),
+        # so a size-3 cube is a single 54-byte block and rotations never
+        # allocate new face arrays.
+        self._buf = np.zeros((6, size, size), dtype=np.int8)
+        # The buffer itself, not a list of views: a separate list could
+        # go stale if a face were ever rebound, and indexing the array
+        # yields the same per-face views.
+        self.faces = self._buf
+        # SoA view: one row per face with its cells flattened, plus the
+        # fully flat view the permutation gathers operate on.
+        self.state = self._buf.reshape(6, size * size)
+        self._flat = self.state.ravel()
+        # Gather destination for the numpy hot path, so applying a
+        # permutation never allocates.
+        self._scratch = np.empty_like(self._flat)
+        self._perms = _compute_move_perms(size)
+        # When every flat index fits in a byte (size <= 6), store the
+        # permutations as uint8: the size-3 state is 54 bytes and each
+        # move's perm another 54, so a move's gather reads from just two
+        # cache lines — the numpy analogue of a byte-shuffle operand.
+        if 6 * size * size <= 256:
+            self._perms = {move: perm.astype(np.uint8)
+                           for move, perm in self._perms.items()}
+        # Stacked table plus move -> row-index map, so a key can be
+        # pre-parsed into a small integer array for _fold_moves.
+        self._perm_table = np.stack(list(self._perms.values()))
+        self._move_ids = {move: i for i, move in enumerate(self._perms)}
+        # Folded whole-key permutations and specialized appliers, keyed
+        # by key string, so repeat encryptions with the same key cost a
+        # single call.
+        self._fold_cache = {}
+        self._encrypt_cache = {}
 
-    def __str__(self):
-        current_printoptions = np.get_printoptions()
-        np.set_printoptions(formatter={'int': '{: 3d}'.format})
+    # A..F are views into the shared buffer.
+    A = property(lambda self: self._buf[0])
+    B = property(lambda self: self._buf[1])
+    C = property(lambda self: self._buf[2])
+    D = property(lambda self: self._buf[3])
+    E = property(lambda self: self._buf[4])
+    F = property(lambda self: self._buf[5])
+
+    def _face_rows(self, face):
+        # Format a whole face with one array2string call (amortizing the
+        # formatter setup, and no global printoptions mutation), then
+        # slice out the per-row "[ .. ]" strings.
+        text = np.array2string(face, formatter={'int': '{: 3d}'.format},
+                               max_line_width=10**6,
+                               threshold=face.size + 1)
+        return [line.strip() for line in text[1:-1].split('\n')]
 
+    def __str__(self):
         output = ""
         indent = " " * (1 + self.size * 4)
-        for row in self.A:
-            output += indent + str(row) + "\n"
-        for zipped_row in zip(self.B, self.C, self.D, self.E):
-            for row in zipped_row:
-                output += str(row)
-            output += "\n"
-        for row in self.F:
-            output += indent + str(row) + "\n"
-
-        np.set_printoptions(current_printoptions)
+        for row in self._face_rows(self.A):
+            output += indent + row + "\n"
+        for zipped_row in zip(self._face_rows(self.B), self._face_rows(self.C),
+                              self._face_rows(self.D), self._face_rows(self.E)):
+            output += "".join(zipped_row) + "\n"
+        for row in self._face_rows(self.F):
+            output += indent + row + "\n"
         return output
 
     def init_arange(self):
-        i = 0
-        for face in self.faces:
-            for y in range(self.size):
-                for x in range(self.size):
-                    face[y][x] = i
-                    i += 1
+        flat = self._buf.ravel()
+        flat[:] = np.arange(flat.size, dtype=np.int8)
+
+    def _apply_perm(self, perm):
+        flat = self._flat
+        if _cube_kernel is not None:
+            _cube_kernel.apply_perm(flat, perm)
+        else:
+            # Double buffer through the preallocated scratch instead of
+            # letting fancy indexing allocate a fresh array per move;
+            # copying back (rather than swapping) keeps the face views
+            # pointed at the canonical buffer.
+            np.take(flat, perm, out=self._scratch, mode='clip')
+            flat[:] = self._scratch
+
+    def _fold_key(self, key):
+        perm = self._fold_cache.get(key)
+        if perm is None:
+            moves = [self._move_ids[move] for move in key.split('-')
+                     if move in self._move_ids]
+            if not moves:
+                return None
+            perm = _fold_moves(np.array(moves, dtype=np.int8),
+                               self._perm_table)
+            perm = perm.astype(self._perm_table.dtype)
+            self._fold_cache[key] = perm
+        return perm
 
     def encrypt(self, key):
-        for move in key.split('-'):
-            if move[0] == 'R':
-                self.rotate_row(int(move[1]))
-            if move[0] == 'C':
-                self.rotate_column(int(move[1]))
-            if move[0] == 'L':
-                self.rotate_level(int(move[1]))
-
-    # ex) R1
-    #          *  *  *                                 *  *  *
-    #          *  *  *                                 *  *  *
-    #          *  *  *                                 *  *  *
-    # *  *  *  *  *  *  *  *  *  *  *  *      *  *  *  *  *  *  *  *  *  *  *  *
-    # *  *  *  *  *  *  *  *  *  *  *  * ==>  *  *  *  *  *  *  *  *  *  *  *  *
-    # 1  2  3  4  5  6  7  8  9 10 11 12     10 11 12  1  2  3  4  5  6  7  8  9
-    #         13 14 15                                19 16 13
-    #         16 17 18                                20 17 14
-    #         19 20 21                                21 18 15
-    #
+        apply_key = self._encrypt_cache.get(key)
+        if apply_key is None:
+            perm = self._fold_key(key)
+            if perm is None:
+                return
+            apply_key = _specialize_apply(self._flat, perm, self._scratch)
+            self._encrypt_cache[key] = apply_key
+        apply_key()
+
+    def encrypt_batch(self, states, key):
+        # Encrypt many flattened cube states of shape (batch, 6*size*size)
+        # under the same key: the key is folded once and applied to the
+        # whole batch with a single gather along the cell axis.
+        perm = self._fold_key(key)
+        if perm is not None:
+            states[:, :] = states[:, perm]
+
     def rotate_row(self, n):
-        # B -> C -> D -> E -> B
-        if n in (1, 2, 3):
-            for i in range(n):
-                tmpB = np.copy(self.B[-1])
-                self.B[-1] = self.E[-1]
-                self.E[-1] = self.D[-1]
-                self.D[-1] = self.C[-1]
-                self.C[-1] = tmpB
-            # rotate F by -90*n
-            self.F = np.rot90(self.F, 4 - n)
-        elif n in (4, 5, 6):
-            for i in range(n - 3):
-                tmpB = np.copy(self.B[:-1])
-                self.B[:-1] = self.E[:-1]
-                self.E[:-1] = self.D[:-1]
-                self.D[:-1] = self.C[:-1]
-                self.C[:-1] = tmpB
-            # rotate A by 90*n
-            self.A = np.rot90(self.A, n - 3)
-
-    # ex) C1
-    #          *  *  1                                 *  *  4
-    #          *  *  2                                 *  *  5
-    #          *  *  3                                 *  *  6
-    # *  *  *  *  *  4 13 14 15 12  *  *      *  *  *  *  *  7 19 16 13  3  *  *
-    # *  *  *  *  *  5 16 17 18 11  *  * ==>  *  *  *  *  *  8 20 17 14  2  *  *
-    # *  *  *  *  *  6 19 20 21 10  *  *      *  *  *  *  *  9 21 18 15  1  *  *
-    #          *  *  7                                 *  * 10
-    #          *  *  8                                 *  * 11
-    #          *  *  9                                 *  * 12
-    #
+        if 1 <= n <= 6:
+            self._apply_perm(self._perms['R%d' % n])
+
     def rotate_column(self, n):
-        # A -> E -> F -> C -> A
-        if n in (1, 2, 3):
-            for i in range(n):
-                tmpA = np.copy(self.A[:, -1])
-                self.A[:, -1] = self.C[:, -1]
-                self.C[:, -1] = self.F[:, -1]
-                self.F[:, -1] = np.flip(self.E[:,  0])
-                self.E[:,  0] = np.flip(tmpA)
-            # rotate D by -90*n
-            self.D = np.rot90(self.D, 4 - n)
-        elif n in (4, 5, 6):
-            for i in range(n - 3):
-                tmpA = np.copy(self.A[:, :-1])
-                self.A[:, :-1] = self.C[:, :-1]
-                self.C[:, :-1] = self.F[:, :-1]
-                self.F[:, :-1] = np.flip(self.E[:, 1:])
-                self.E[:,  1:] = np.flip(tmpA)
-            # rotate B by 90*n
-            self.B = np.rot90(self.B, n - 3)
-
-    # ex) L1
-    #           1  2  3                                4  5  6
-    #           *  *  *                                *  *  *
-    #           *  *  *                                *  *  *
-    # 12  *  *  *  *  *  *  *  4 13 14 15     3  *  *  *  *  *  *  *  7 19 16 13
-    # 11  *  *  *  *  *  *  *  5 16 17 18 ==> 2  *  *  *  *  *  *  *  8 20 17 14
-    # 10  *  *  *  *  *  *  *  6 19 20 21     1  *  *  *  *  *  *  *  9 21 18 15
-    #           *  *  *                                *  *  *
-    #           *  *  *                                *  *  *
-    #           9  8  7                               12 11 10
-    #
+        if 1 <= n <= 6:
+            self._apply_perm(self._perms['C%d' % n])
+
     def rotate_level(self, n):
-        # A -> B -> F -> D -> A
-        if n in (1, 2, 3):
-            for i in range(n):
-                tmpA = np.copy(self.A[0])
-                self.A[0]     = self.D[:, -1]
-                self.D[:, -1] = np.flip(self.F[-1])
-                self.F[-1]    = self.B[:, 0]
-                self.B[:,  0] = np.flip(tmpA)
-            # rotate E by -90*n
-            self.E = np.rot90(self.E, 4 - n)
-        elif n in (4, 5, 6):
-            for i in range(n - 3):
-                tmpA = np.copy(self.A[1:])
-                self.A[1:]     = np.rot90(self.D[:, :-1])
-                self.D[:, :-1] = np.rot90(self.F[:-1])
-                self.F[:-1]    = np.rot90(self.B[:, 1:])
-                self.B[:,  1:] = np.rot90(tmpA)
-            # rotate C by 90*n
-            self.C = np.rot90(self.C, n - 3)
+        if 1 <= n <= 6:
+            self._apply_perm(self._perms['L%d' % n])
+
+
+def _bitperm_table(perm):
+    # Turn a cell permutation into mask-and-shift pairs over the packed
+    # state viewed as one little-endian integer (nibble i at bit 4*i).
+    # Source nibbles travelling the same bit distance share one mask, so
+    # applying the whole permutation is a handful of &/<<//>> ops on a
+    # single Python int.
+    masks = {}
+    for dst, src in enumerate(perm):
+        delta = 4 * (dst - int(src))
+        masks[delta] = masks.get(delta, 0) | (0xF << (4 * int(src)))
+    return list(masks.items())
+
+def _apply_bitperm(value, table):
+    out = 0
+    for delta, mask in table:
+        chunk = value & mask
+        out |= chunk << delta if delta >= 0 else chunk >> -delta
+    return out
+
+
+def _pack_nibbles(cells):
+    # Two 4-bit cells per byte: even cell in the low nibble, odd in the
+    # high nibble.
+    return (cells[0::2] | (cells[1::2] << 4)).astype(np.uint8)
+
+def _unpack_nibbles(packed):
+    cells = np.empty(packed.size * 2, dtype=np.uint8)
+    cells[0::2] = packed & 0x0F
+    cells[1::2] = packed >> 4
+    return cells
+
+
+class CompactRubikCube:
+    # Nibble-packed size-3 cube tracking face ids (colors) only.  A face
+    # id is 0..5 and fits in 4 bits, so the 54 cells pack two-per-byte
+    # into 27 bytes — half an XMM register.  Moves are the same cell
+    # permutations as RubikCube's; they are applied by unpacking to one
+    # nibble per byte, gathering, and repacking.  (A true in-register
+    # nibble shuffle needs a native VPSHUFB kernel; the packed layout
+    # here is the dependency-free part of that design.)
+
+    SIZE = 3
+
+    def __init__(self):
+        self.size = self.SIZE
+        # Borrow the move tables and per-key fold cache from a full cube.
+        self._tables = RubikCube(self.SIZE)
+        self.state = np.zeros(6 * self.SIZE * self.SIZE // 2, dtype=np.uint8)
+        # Per-key mask/shift tables for the integer bit-permutation path.
+        self._bitperm_cache = {}
+
+    def init_faces(self):
+        # Solved cube: every cell carries its face id.
+        cells = np.arange(6 * self.SIZE * self.SIZE, dtype=np.uint8) // (self.SIZE * self.SIZE)
+        self.state = _pack_nibbles(cells)
+
+    def get(self, i):
+        return (self.state[i >> 1] >> (4 * (i & 1))) & 0x0F
+
+    def encrypt(self, key):
+        # The 27-byte state is one 216-bit integer — i.e. a CPU-register
+        # sized value for the interpreter — and the folded key is a set
+        # of precomputed mask-and-shift pairs over it, avoiding any
+        # numpy call overhead on this tiny state.
+        table = self._bitperm_cache.get(key)
+        if table is None:
+            perm = self._tables._fold_key(key)
+            if perm is None:
+                return
+            table = _bitperm_table(perm)
+            self._bitperm_cache[key] = table
+        value = int.from_bytes(self.state.tobytes(), 'little')
+        value = _apply_bitperm(value, table)
+        self.state = np.frombuffer(
+            value.to_bytes(self.state.size, 'little'), dtype=np.uint8).copy()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,11 @@
+
+# Builds the optional native gather kernel used by main.py:
+#   python setup.py build_ext --inplace
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='rubiks-crypto-cube',
+    ext_modules=cythonize('_cube_kernel.pyx'),
+)